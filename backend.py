@@ -3,18 +3,57 @@ TradeForge - Indian Markets Trading Platform Backend
 Supports NSE/BSE real-time data, backtesting, paper trading, and forward testing
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import bottleneck as bn
 from datetime import datetime, timedelta
 import ta
 import json
+import orjson
 import requests
-from typing import Dict, List, Any
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from cachetools import TTLCache
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+import fast_indicators
+from _njit import njit, prange, NUMBA_AVAILABLE
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize types orjson doesn't handle natively (e.g. pandas Timestamp)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, with native NumPy support"""
+    
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_json_default, option=self.option).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Skip the bytes -> str round trip of dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_json_default, option=self.option)
+        return self._app.response_class(body, mimetype='application/json')
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Configuration
@@ -36,6 +75,189 @@ BSE_INDICES = {
 
 ALL_INDICES = {**NSE_INDICES, **BSE_INDICES}
 
+# Short-lived caches for upstream Yahoo data
+QUOTE_CACHE_TTL = 5          # seconds
+HISTORICAL_CACHE_TTL = 3600  # seconds
+
+
+class _KeyedLocks:
+    """One lock per cache key, so only callers fetching the same key wait on each other.
+    
+    Entries are dropped once no thread holds or waits on them.
+    """
+    
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}  # key -> [lock, number of holders/waiters]
+    
+    @contextmanager
+    def hold(self, *keys):
+        """Acquire the locks for `keys` (in sorted order, to avoid deadlocks)"""
+        keys = sorted(set(keys))
+        with self._guard:
+            entries = [self._locks.setdefault(key, [threading.Lock(), 0]) for key in keys]
+            for entry in entries:
+                entry[1] += 1
+        try:
+            with ExitStack() as stack:
+                for entry in entries:
+                    stack.enter_context(entry[0])
+                yield
+        finally:
+            with self._guard:
+                for key, entry in zip(keys, entries):
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self._locks[key]
+
+
+# TTLCache isn't thread-safe; _cache_lock only guards the brief cache reads/writes,
+# while the per-key locks are held across the upstream fetch to avoid dogpiling
+_cache_lock = threading.Lock()
+_quote_cache = TTLCache(maxsize=64, ttl=QUOTE_CACHE_TTL)
+_quote_locks = _KeyedLocks()
+_hist_cache = TTLCache(maxsize=512, ttl=HISTORICAL_CACHE_TTL)
+_hist_locks = _KeyedLocks()
+
+# yf.download keeps its results in module globals that every call resets,
+# so overlapping downloads clobber each other
+_download_lock = threading.Lock()
+
+# Upper bound on shortPeriods x longPeriods for /api/backtest/grid
+MAX_GRID_COMBOS = 400
+
+# numba's fallback workqueue threading layer aborts the process if a parallel
+# kernel is entered from two threads at once, so grid runs are serialized
+_grid_lock = threading.Lock()
+
+# Server-Sent Events quote stream
+STREAM_INTERVAL = 5     # seconds between upstream fetches
+STREAM_KEEPALIVE = 15   # seconds between keep-alive comments when nothing changes
+
+
+def _close_prices(data: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+    """Close prices as float64 and their dates, with missing (NaN) bars dropped.
+    
+    Every backtest path uses this, so a grid row and a single backtest for the
+    same parameters see the same bars.
+    """
+    close = data['Close'].to_numpy(dtype=np.float64)
+    present = ~np.isnan(close)
+    if present.all():
+        return close, data.index
+    return close[present], data.index[present]
+
+
+def _valid_rows(*arrays: np.ndarray) -> np.ndarray:
+    """Boolean mask of bars where none of the given arrays is NaN"""
+    mask = np.ones(len(arrays[0]), dtype=bool)
+    for arr in arrays:
+        mask &= ~np.isnan(arr)
+    return mask
+
+
+def _crosses_above(a: np.ndarray, b) -> np.ndarray:
+    """Boolean mask of bars where `a` crosses above `b` (array or scalar)"""
+    b = np.broadcast_to(b, a.shape)
+    mask = np.zeros(len(a), dtype=bool)
+    mask[1:] = (a[1:] > b[1:]) & (a[:-1] <= b[:-1])
+    return mask
+
+
+def _crosses_below(a: np.ndarray, b) -> np.ndarray:
+    """Boolean mask of bars where `a` crosses below `b` (array or scalar)"""
+    b = np.broadcast_to(b, a.shape)
+    mask = np.zeros(len(a), dtype=bool)
+    mask[1:] = (a[1:] < b[1:]) & (a[:-1] >= b[:-1])
+    return mask
+
+
+@njit(cache=True)
+def _simulate_trades(close: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                     capital: float, position_size: float):
+    """Run the long-only entry/exit state machine over precomputed signals.
+    
+    Only bars where a signal fires are visited. Any position still open at the
+    end is closed on the last bar. Returns parallel arrays (entry_idx, exit_idx,
+    entry_px, exit_px, qty, pnl) describing each trade, plus final capital.
+    """
+    events = np.flatnonzero(entries | exits)
+    max_trades = len(events) // 2 + 1
+    
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    entry_px = np.empty(max_trades, dtype=np.float64)
+    exit_px = np.empty(max_trades, dtype=np.float64)
+    qty = np.empty(max_trades, dtype=np.int64)
+    pnl = np.empty(max_trades, dtype=np.float64)
+    
+    n_trades = 0
+    in_position = False
+    
+    for i in events:
+        # Buy signal
+        if not in_position and entries[i]:
+            quantity = int((capital * position_size) / close[i])
+            if quantity > 0:
+                entry_idx[n_trades] = i
+                entry_px[n_trades] = close[i]
+                qty[n_trades] = quantity
+                in_position = True
+        
+        # Sell signal
+        elif in_position and exits[i]:
+            trade_pnl = (close[i] - entry_px[n_trades]) * qty[n_trades]
+            capital += trade_pnl
+            exit_idx[n_trades] = i
+            exit_px[n_trades] = close[i]
+            pnl[n_trades] = trade_pnl
+            n_trades += 1
+            in_position = False
+    
+    # Close any open position
+    if in_position:
+        last = len(close) - 1
+        trade_pnl = (close[last] - entry_px[n_trades]) * qty[n_trades]
+        capital += trade_pnl
+        exit_idx[n_trades] = last
+        exit_px[n_trades] = close[last]
+        pnl[n_trades] = trade_pnl
+        n_trades += 1
+    
+    return (entry_idx[:n_trades], exit_idx[:n_trades], entry_px[:n_trades],
+            exit_px[:n_trades], qty[:n_trades], pnl[:n_trades], capital)
+
+
+@njit(parallel=True, cache=True)
+def _simulate_grid(close: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                   capital: float, position_size: float):
+    """Run the trade simulation for every row of (combos, bars) signal matrices.
+    
+    Returns per-combo arrays (final_capital, n_trades, n_wins, n_losses,
+    gross_win, gross_loss); gross_loss is the (negative) sum of losing trades.
+    """
+    n_combos = entries.shape[0]
+    final_capital = np.empty(n_combos, dtype=np.float64)
+    n_trades = np.zeros(n_combos, dtype=np.int64)
+    n_wins = np.zeros(n_combos, dtype=np.int64)
+    n_losses = np.zeros(n_combos, dtype=np.int64)
+    gross_win = np.zeros(n_combos, dtype=np.float64)
+    gross_loss = np.zeros(n_combos, dtype=np.float64)
+    
+    for k in prange(n_combos):
+        _, _, _, _, _, pnl, final = _simulate_trades(close, entries[k], exits[k], capital, position_size)
+        final_capital[k] = final
+        n_trades[k] = len(pnl)
+        for trade_pnl in pnl:
+            if trade_pnl > 0:
+                n_wins[k] += 1
+                gross_win[k] += trade_pnl
+            elif trade_pnl < 0:
+                n_losses[k] += 1
+                gross_loss[k] += trade_pnl
+    
+    return final_capital, n_trades, n_wins, n_losses, gross_win, gross_loss
+
 
 class MarketDataProvider:
     """Fetches real-time and historical data from NSE/BSE"""
@@ -43,41 +265,81 @@ class MarketDataProvider:
     @staticmethod
     def get_real_time_data(symbols: List[str]) -> List[Dict]:
         """Fetch real-time data for given symbols"""
+        ticker_symbols = {symbol: ALL_INDICES[symbol] for symbol in symbols if symbol in ALL_INDICES}
+        if not ticker_symbols:
+            return []
+        
+        # Held across the download so concurrent requests for the same symbols don't all refetch
+        with _quote_locks.hold(*ticker_symbols):
+            with _cache_lock:
+                missing = {symbol: t for symbol, t in ticker_symbols.items() if symbol not in _quote_cache}
+            
+            if missing:
+                downloaded = MarketDataProvider._download_quotes(missing)
+                with _cache_lock:
+                    for quote in downloaded:
+                        _quote_cache[quote['symbol']] = quote
+            
+            with _cache_lock:
+                quotes = [_quote_cache.get(symbol) for symbol in ticker_symbols]
+        
+        return [quote for quote in quotes if quote]
+    
+    @staticmethod
+    def _download_quotes(ticker_symbols: Dict[str, str]) -> List[Dict]:
+        """Download quotes for a {symbol: ticker} mapping"""
+        # One batched download for every symbol instead of a request per ticker
+        try:
+            with _download_lock:
+                hist = yf.download(
+                    list(dict.fromkeys(ticker_symbols.values())),
+                    period='2d',
+                    group_by='ticker',
+                    threads=True,
+                    progress=False,
+                    auto_adjust=False,
+                )
+        except Exception as e:
+            print(f"Error fetching data for {list(ticker_symbols)}: {e}")
+            return []
+        
         data = []
         
-        for symbol in symbols:
+        for symbol, ticker_symbol in ticker_symbols.items():
             try:
-                ticker_symbol = ALL_INDICES.get(symbol)
-                if not ticker_symbol:
-                    continue
-                
-                ticker = yf.Ticker(ticker_symbol)
-                info = ticker.info
-                hist = ticker.history(period='2d')
-                
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2]
-                    change = current_price - prev_close
-                    change_percent = (change / prev_close) * 100
-                    
-                    data.append({
-                        'symbol': symbol,
-                        'price': round(current_price, 2),
-                        'change': round(change, 2),
-                        'changePercent': round(change_percent, 2),
-                        'volume': int(hist['Volume'].iloc[-1]),
-                        'high': round(hist['High'].iloc[-1], 2),
-                        'low': round(hist['Low'].iloc[-1], 2),
-                        'open': round(hist['Open'].iloc[-1], 2),
-                        'exchange': 'NSE' if symbol in NSE_INDICES else 'BSE',
-                    })
+                symbol_hist = hist[ticker_symbol] if isinstance(hist.columns, pd.MultiIndex) else hist
+                quote = MarketDataProvider._build_quote(symbol, symbol_hist.dropna(subset=['Close']))
+                if quote:
+                    data.append(quote)
             except Exception as e:
                 print(f"Error fetching data for {symbol}: {e}")
                 continue
         
         return data
     
+    @staticmethod
+    def _build_quote(symbol: str, hist: pd.DataFrame) -> Optional[Dict]:
+        """Build a quote from the last two bars of a symbol's history"""
+        if len(hist) < 2:
+            return None
+        
+        current_price = hist['Close'].iloc[-1]
+        prev_close = hist['Close'].iloc[-2]
+        change = current_price - prev_close
+        change_percent = (change / prev_close) * 100
+        
+        return {
+            'symbol': symbol,
+            'price': round(current_price, 2),
+            'change': round(change, 2),
+            'changePercent': round(change_percent, 2),
+            'volume': int(hist['Volume'].iloc[-1]),
+            'high': round(hist['High'].iloc[-1], 2),
+            'low': round(hist['Low'].iloc[-1], 2),
+            'open': round(hist['Open'].iloc[-1], 2),
+            'exchange': 'NSE' if symbol in NSE_INDICES else 'BSE',
+        }
+    
     @staticmethod
     def get_historical_data(symbol: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
         """Fetch historical data for backtesting"""
@@ -85,9 +347,19 @@ class MarketDataProvider:
         if not ticker_symbol:
             return pd.DataFrame()
         
-        ticker = yf.Ticker(ticker_symbol)
-        hist = ticker.history(period=period, interval=interval)
+        key = (symbol, period, interval)
+        with _hist_locks.hold(key):
+            with _cache_lock:
+                hist = _hist_cache.get(key)
+            
+            if hist is None:
+                ticker = yf.Ticker(ticker_symbol)
+                hist = ticker.history(period=period, interval=interval)
+                if not hist.empty:
+                    with _cache_lock:
+                        _hist_cache[key] = hist
         
+        # The cached frame is shared between requests; callers must not mutate it
         return hist
     
     @staticmethod
@@ -124,41 +396,73 @@ class MarketDataProvider:
 class TechnicalIndicators:
     """Calculate technical indicators for strategies"""
     
+    @staticmethod
+    def sma(close: np.ndarray, period: int) -> np.ndarray:
+        """Simple Moving Average"""
+        if period > len(close):
+            return np.full(len(close), np.nan)
+        return bn.move_mean(close, window=period, min_count=period)
+    
+    @staticmethod
+    def ema(close: np.ndarray, period: int) -> np.ndarray:
+        """Exponential Moving Average"""
+        if NUMBA_AVAILABLE:
+            return fast_indicators.ema(close, period)
+        return ta.trend.ema_indicator(pd.Series(close), window=period).to_numpy()
+    
+    @staticmethod
+    def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+        """Relative Strength Index"""
+        if NUMBA_AVAILABLE:
+            return fast_indicators.rsi(close, period)
+        return ta.momentum.rsi(pd.Series(close), window=period).to_numpy()
+    
+    @staticmethod
+    def macd(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """MACD line, signal line and histogram"""
+        if NUMBA_AVAILABLE:
+            return fast_indicators.macd(close)
+        macd = ta.trend.MACD(pd.Series(close))
+        return macd.macd().to_numpy(), macd.macd_signal().to_numpy(), macd.macd_diff().to_numpy()
+    
+    @staticmethod
+    def bollinger_bands(close: np.ndarray, period: int = 20) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bollinger Bands as (upper, middle, lower)"""
+        if period > len(close):
+            empty = np.full(len(close), np.nan)
+            return empty, empty.copy(), empty.copy()
+        middle = bn.move_mean(close, window=period, min_count=period)
+        band = 2 * bn.move_std(close, window=period, min_count=period, ddof=0)
+        return middle + band, middle, middle - band
+    
+    # DataFrame helpers; these return a new frame and leave `df` untouched
+    
     @staticmethod
     def add_sma(df: pd.DataFrame, period: int, column: str = 'Close') -> pd.DataFrame:
         """Add Simple Moving Average"""
-        df[f'SMA_{period}'] = ta.trend.sma_indicator(df[column], window=period)
-        return df
+        return df.assign(**{f'SMA_{period}': TechnicalIndicators.sma(df[column].to_numpy(dtype=np.float64), period)})
     
     @staticmethod
     def add_ema(df: pd.DataFrame, period: int, column: str = 'Close') -> pd.DataFrame:
         """Add Exponential Moving Average"""
-        df[f'EMA_{period}'] = ta.trend.ema_indicator(df[column], window=period)
-        return df
+        return df.assign(**{f'EMA_{period}': TechnicalIndicators.ema(df[column].to_numpy(dtype=np.float64), period)})
     
     @staticmethod
     def add_rsi(df: pd.DataFrame, period: int = 14, column: str = 'Close') -> pd.DataFrame:
         """Add Relative Strength Index"""
-        df['RSI'] = ta.momentum.rsi(df[column], window=period)
-        return df
+        return df.assign(RSI=TechnicalIndicators.rsi(df[column].to_numpy(dtype=np.float64), period))
     
     @staticmethod
     def add_macd(df: pd.DataFrame, column: str = 'Close') -> pd.DataFrame:
         """Add MACD indicator"""
-        macd = ta.trend.MACD(df[column])
-        df['MACD'] = macd.macd()
-        df['MACD_signal'] = macd.macd_signal()
-        df['MACD_diff'] = macd.macd_diff()
-        return df
+        macd, signal, diff = TechnicalIndicators.macd(df[column].to_numpy(dtype=np.float64))
+        return df.assign(MACD=macd, MACD_signal=signal, MACD_diff=diff)
     
     @staticmethod
     def add_bollinger_bands(df: pd.DataFrame, period: int = 20, column: str = 'Close') -> pd.DataFrame:
         """Add Bollinger Bands"""
-        bollinger = ta.volatility.BollingerBands(df[column], window=period)
-        df['BB_upper'] = bollinger.bollinger_hband()
-        df['BB_middle'] = bollinger.bollinger_mavg()
-        df['BB_lower'] = bollinger.bollinger_lband()
-        return df
+        upper, middle, lower = TechnicalIndicators.bollinger_bands(df[column].to_numpy(dtype=np.float64), period)
+        return df.assign(BB_upper=upper, BB_middle=middle, BB_lower=lower)
 
 
 class BacktestEngine:
@@ -168,13 +472,32 @@ class BacktestEngine:
         self.initial_capital = initial_capital
         self.capital = initial_capital
         self.positions = []
-        self.trades = []
+        self._reset_trades()
+        self._sma_cache: Dict[int, np.ndarray] = {}
+    
+    def _get_sma(self, close: np.ndarray, period: int) -> np.ndarray:
+        """SMA of `close`, computed once per period for the current dataset"""
+        sma = self._sma_cache.get(period)
+        if sma is None:
+            sma = self._sma_cache[period] = TechnicalIndicators.sma(close, period)
+        return sma
+    
+    def _reset_trades(self):
+        """Clear trade storage; trades are kept as parallel arrays, one entry per trade"""
+        self._dates = pd.Index([])
+        self._entry_idx = np.empty(0, dtype=np.int64)
+        self._exit_idx = np.empty(0, dtype=np.int64)
+        self._entry_px = np.empty(0, dtype=np.float64)
+        self._exit_px = np.empty(0, dtype=np.float64)
+        self._qty = np.empty(0, dtype=np.int64)
+        self._pnl = np.empty(0, dtype=np.float64)
     
     def run_backtest(self, strategy: Dict, data: pd.DataFrame) -> Dict:
         """Execute backtest with given strategy"""
         self.capital = self.initial_capital
         self.positions = []
-        self.trades = []
+        self._reset_trades()
+        self._sma_cache = {}
         
         strategy_type = strategy.get('type', 'sma_crossover')
         
@@ -187,72 +510,92 @@ class BacktestEngine:
         else:
             return {'error': 'Unknown strategy type'}
     
+    def run_grid_backtest(self, strategy: Dict, data: pd.DataFrame,
+                          short_periods: List[int], long_periods: List[int]) -> Dict:
+        """Backtest an SMA crossover over every (short, long) period pair in one pass.
+        
+        Each SMA is computed once per unique period, and crossover signals for all
+        pairs with short < long are built as one (pairs, bars) array before a
+        parallel simulation. Pairs where the short period is not below the long
+        period are never simulated.
+        """
+        position_size = strategy.get('positionSize', 10) / 100
+        self._sma_cache = {}
+        
+        pairs = [
+            (short_period, long_period)
+            for short_period in dict.fromkeys(short_periods)
+            for long_period in dict.fromkeys(long_periods)
+            if short_period < long_period
+        ]
+        if not pairs:
+            return {'results': []}
+        
+        close, _ = _close_prices(data)
+        close = np.ascontiguousarray(close)
+        
+        # Periods shared between the two lists are only computed once
+        periods = list(dict.fromkeys(p for pair in pairs for p in pair))
+        sma_mat = np.vstack([self._get_sma(close, p) for p in periods])
+        row = {p: i for i, p in enumerate(periods)}
+        short_mat = sma_mat[[row[short_period] for short_period, _ in pairs]]
+        long_mat = sma_mat[[row[long_period] for _, long_period in pairs]]
+        
+        # Comparisons against warm-up NaNs are False, so each pair only trades
+        # once both of its SMAs are defined
+        entries = np.zeros(short_mat.shape, dtype=bool)
+        exits = np.zeros(short_mat.shape, dtype=bool)
+        entries[:, 1:] = (short_mat[:, 1:] > long_mat[:, 1:]) & (short_mat[:, :-1] <= long_mat[:, :-1])
+        exits[:, 1:] = (short_mat[:, 1:] < long_mat[:, 1:]) & (short_mat[:, :-1] >= long_mat[:, :-1])
+        
+        with _grid_lock:
+            final_capital, n_trades, n_wins, n_losses, gross_win, gross_loss = _simulate_grid(
+                close, entries, exits, float(self.initial_capital), float(position_size)
+            )
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_rate = np.where(n_trades > 0, n_wins / n_trades * 100, 0.0)
+            avg_win = np.where(n_wins > 0, gross_win / n_wins, 0.0)
+            avg_loss = np.where(n_losses > 0, gross_loss / n_losses, 0.0)
+            profit_factor = np.where(avg_loss != 0, np.abs(avg_win / avg_loss), 0.0)
+        
+        results = [
+            {
+                'shortPeriod': short_period,
+                'longPeriod': long_period,
+                'finalCapital': float(final_capital[k]),
+                'totalPnL': float(gross_win[k] + gross_loss[k]),
+                'totalTrades': int(n_trades[k]),
+                'winningTrades': int(n_wins[k]),
+                'losingTrades': int(n_losses[k]),
+                'winRate': float(win_rate[k]),
+                'avgWin': float(avg_win[k]),
+                'avgLoss': float(avg_loss[k]),
+                'profitFactor': float(profit_factor[k]),
+            }
+            for k, (short_period, long_period) in enumerate(pairs)
+        ]
+        
+        return {'results': results}
+    
     def _backtest_sma_crossover(self, strategy: Dict, data: pd.DataFrame) -> Dict:
         """Backtest SMA crossover strategy"""
         short_period = strategy.get('shortPeriod', 10)
         long_period = strategy.get('longPeriod', 50)
         position_size = strategy.get('positionSize', 10) / 100
         
-        # Add indicators
-        data = TechnicalIndicators.add_sma(data, short_period)
-        data = TechnicalIndicators.add_sma(data, long_period)
+        close, dates = _close_prices(data)
+        short_sma = self._get_sma(close, short_period)
+        long_sma = self._get_sma(close, long_period)
         
-        data = data.dropna()
-        position = None
+        valid = _valid_rows(short_sma, long_sma)
+        short_sma, long_sma = short_sma[valid], long_sma[valid]
         
-        for i in range(1, len(data)):
-            current_row = data.iloc[i]
-            prev_row = data.iloc[i-1]
-            
-            short_sma = current_row[f'SMA_{short_period}']
-            long_sma = current_row[f'SMA_{long_period}']
-            prev_short_sma = prev_row[f'SMA_{short_period}']
-            prev_long_sma = prev_row[f'SMA_{long_period}']
-            
-            # Buy signal
-            if not position and short_sma > long_sma and prev_short_sma <= prev_long_sma:
-                quantity = int((self.capital * position_size) / current_row['Close'])
-                if quantity > 0:
-                    position = {
-                        'entry_price': current_row['Close'],
-                        'quantity': quantity,
-                        'entry_date': current_row.name,
-                    }
-            
-            # Sell signal
-            elif position and short_sma < long_sma and prev_short_sma >= prev_long_sma:
-                pnl = (current_row['Close'] - position['entry_price']) * position['quantity']
-                self.capital += pnl
-                
-                self.trades.append({
-                    'entry_date': str(position['entry_date']),
-                    'exit_date': str(current_row.name),
-                    'entry_price': float(position['entry_price']),
-                    'exit_price': float(current_row['Close']),
-                    'quantity': position['quantity'],
-                    'pnl': float(pnl),
-                    'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-                })
-                
-                position = None
-        
-        # Close any open position
-        if position:
-            last_row = data.iloc[-1]
-            pnl = (last_row['Close'] - position['entry_price']) * position['quantity']
-            self.capital += pnl
-            
-            self.trades.append({
-                'entry_date': str(position['entry_date']),
-                'exit_date': str(last_row.name),
-                'entry_price': float(position['entry_price']),
-                'exit_price': float(last_row['Close']),
-                'quantity': position['quantity'],
-                'pnl': float(pnl),
-                'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-            })
+        # Buy when short SMA crosses above long SMA, sell when it crosses below
+        entries = _crosses_above(short_sma, long_sma)
+        exits = _crosses_below(short_sma, long_sma)
         
-        return self._calculate_metrics()
+        return self._run_signals(close[valid], dates[valid], entries, exits, position_size)
     
     def _backtest_rsi(self, strategy: Dict, data: pd.DataFrame) -> Dict:
         """Backtest RSI strategy"""
@@ -261,121 +604,60 @@ class BacktestEngine:
         overbought = strategy.get('overbought', 70)
         position_size = strategy.get('positionSize', 10) / 100
         
-        data = TechnicalIndicators.add_rsi(data, rsi_period)
-        data = data.dropna()
+        close, dates = _close_prices(data)
+        rsi = TechnicalIndicators.rsi(close, rsi_period)
         
-        position = None
-        
-        for i in range(1, len(data)):
-            current_row = data.iloc[i]
-            prev_row = data.iloc[i-1]
-            
-            # Buy signal (RSI crosses above oversold)
-            if not position and current_row['RSI'] > oversold and prev_row['RSI'] <= oversold:
-                quantity = int((self.capital * position_size) / current_row['Close'])
-                if quantity > 0:
-                    position = {
-                        'entry_price': current_row['Close'],
-                        'quantity': quantity,
-                        'entry_date': current_row.name,
-                    }
-            
-            # Sell signal (RSI crosses below overbought)
-            elif position and current_row['RSI'] < overbought and prev_row['RSI'] >= overbought:
-                pnl = (current_row['Close'] - position['entry_price']) * position['quantity']
-                self.capital += pnl
-                
-                self.trades.append({
-                    'entry_date': str(position['entry_date']),
-                    'exit_date': str(current_row.name),
-                    'entry_price': float(position['entry_price']),
-                    'exit_price': float(current_row['Close']),
-                    'quantity': position['quantity'],
-                    'pnl': float(pnl),
-                    'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-                })
-                
-                position = None
+        valid = _valid_rows(rsi)
+        rsi = rsi[valid]
         
-        # Close any open position
-        if position:
-            last_row = data.iloc[-1]
-            pnl = (last_row['Close'] - position['entry_price']) * position['quantity']
-            self.capital += pnl
-            
-            self.trades.append({
-                'entry_date': str(position['entry_date']),
-                'exit_date': str(last_row.name),
-                'entry_price': float(position['entry_price']),
-                'exit_price': float(last_row['Close']),
-                'quantity': position['quantity'],
-                'pnl': float(pnl),
-                'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-            })
+        # Buy when RSI crosses above oversold, sell when it crosses below overbought
+        entries = _crosses_above(rsi, oversold)
+        exits = _crosses_below(rsi, overbought)
         
-        return self._calculate_metrics()
+        return self._run_signals(close[valid], dates[valid], entries, exits, position_size)
     
     def _backtest_macd(self, strategy: Dict, data: pd.DataFrame) -> Dict:
         """Backtest MACD strategy"""
         position_size = strategy.get('positionSize', 10) / 100
         
-        data = TechnicalIndicators.add_macd(data)
-        data = data.dropna()
+        close, dates = _close_prices(data)
+        macd, macd_signal, macd_diff = TechnicalIndicators.macd(close)
         
-        position = None
+        valid = _valid_rows(macd, macd_signal, macd_diff)
+        macd, macd_signal = macd[valid], macd_signal[valid]
         
-        for i in range(1, len(data)):
-            current_row = data.iloc[i]
-            prev_row = data.iloc[i-1]
-            
-            # Buy signal (MACD crosses above signal)
-            if not position and current_row['MACD'] > current_row['MACD_signal'] and prev_row['MACD'] <= prev_row['MACD_signal']:
-                quantity = int((self.capital * position_size) / current_row['Close'])
-                if quantity > 0:
-                    position = {
-                        'entry_price': current_row['Close'],
-                        'quantity': quantity,
-                        'entry_date': current_row.name,
-                    }
-            
-            # Sell signal (MACD crosses below signal)
-            elif position and current_row['MACD'] < current_row['MACD_signal'] and prev_row['MACD'] >= prev_row['MACD_signal']:
-                pnl = (current_row['Close'] - position['entry_price']) * position['quantity']
-                self.capital += pnl
-                
-                self.trades.append({
-                    'entry_date': str(position['entry_date']),
-                    'exit_date': str(current_row.name),
-                    'entry_price': float(position['entry_price']),
-                    'exit_price': float(current_row['Close']),
-                    'quantity': position['quantity'],
-                    'pnl': float(pnl),
-                    'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-                })
-                
-                position = None
-        
-        # Close any open position
-        if position:
-            last_row = data.iloc[-1]
-            pnl = (last_row['Close'] - position['entry_price']) * position['quantity']
-            self.capital += pnl
-            
-            self.trades.append({
-                'entry_date': str(position['entry_date']),
-                'exit_date': str(last_row.name),
-                'entry_price': float(position['entry_price']),
-                'exit_price': float(last_row['Close']),
-                'quantity': position['quantity'],
-                'pnl': float(pnl),
-                'pnl_percent': float((pnl / (position['entry_price'] * position['quantity'])) * 100),
-            })
+        # Buy when MACD crosses above signal, sell when it crosses below
+        entries = _crosses_above(macd, macd_signal)
+        exits = _crosses_below(macd, macd_signal)
         
+        return self._run_signals(close[valid], dates[valid], entries, exits, position_size)
+    
+    def _run_signals(self, close: np.ndarray, dates: pd.Index, entries: np.ndarray,
+                     exits: np.ndarray, position_size: float) -> Dict:
+        """Simulate trades from precomputed entry/exit signals and compute metrics"""
+        (self._entry_idx, self._exit_idx, self._entry_px, self._exit_px,
+         self._qty, self._pnl, self.capital) = _simulate_trades(
+            np.ascontiguousarray(close), entries, exits, float(self.capital), float(position_size)
+        )
+        self._dates = dates
         return self._calculate_metrics()
     
+    def _trades_payload(self) -> Dict[str, List]:
+        """Trades as a columnar dict, converting each column in one vectorized call"""
+        pnl_percent = self._pnl / (self._entry_px * self._qty) * 100
+        return {
+            'entry_date': self._dates[self._entry_idx].astype(str).tolist(),
+            'exit_date': self._dates[self._exit_idx].astype(str).tolist(),
+            'entry_price': self._entry_px.tolist(),
+            'exit_price': self._exit_px.tolist(),
+            'quantity': self._qty.tolist(),
+            'pnl': self._pnl.tolist(),
+            'pnl_percent': pnl_percent.tolist(),
+        }
+    
     def _calculate_metrics(self) -> Dict:
         """Calculate performance metrics"""
-        if not self.trades:
+        if len(self._pnl) == 0:
             return {
                 'finalCapital': self.initial_capital,
                 'totalPnL': 0,
@@ -386,36 +668,97 @@ class BacktestEngine:
                 'avgWin': 0,
                 'avgLoss': 0,
                 'profitFactor': 0,
-                'trades': [],
+                'maxDrawdown': 0,
+                'sharpeRatio': 0,
+                'equityCurve': [float(self.initial_capital)],
+                'trades': self._trades_payload(),
             }
         
-        total_pnl = sum(trade['pnl'] for trade in self.trades)
-        winning_trades = [t for t in self.trades if t['pnl'] > 0]
-        losing_trades = [t for t in self.trades if t['pnl'] < 0]
+        pnls = self._pnl
+        wins = pnls[pnls > 0]
+        losses = pnls[pnls < 0]
         
-        win_count = len(winning_trades)
-        loss_count = len(losing_trades)
-        win_rate = (win_count / len(self.trades)) * 100 if self.trades else 0
+        total_pnl = pnls.sum()
+        win_count = len(wins)
+        loss_count = len(losses)
+        win_rate = (win_count / len(pnls)) * 100
         
-        avg_win = sum(t['pnl'] for t in winning_trades) / win_count if win_count > 0 else 0
-        avg_loss = sum(t['pnl'] for t in losing_trades) / loss_count if loss_count > 0 else 0
+        avg_win = wins.mean() if win_count > 0 else 0
+        avg_loss = losses.mean() if loss_count > 0 else 0
         
         profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else 0
         
+        # Equity after each closed trade, starting from initial capital
+        equity = self.initial_capital + np.concatenate(([0.0], np.cumsum(pnls)))
+        max_drawdown = (equity - np.maximum.accumulate(equity)).min()
+        
+        # Per-trade Sharpe ratio of returns on the equity each trade started from
+        returns = pnls / equity[:-1]
+        returns_std = returns.std(ddof=1) if len(returns) > 1 else 0
+        sharpe_ratio = returns.mean() / returns_std if returns_std > 0 else 0
+        
         return {
             'finalCapital': float(self.capital),
             'totalPnL': float(total_pnl),
-            'totalTrades': len(self.trades),
+            'totalTrades': len(pnls),
             'winningTrades': win_count,
             'losingTrades': loss_count,
             'winRate': float(win_rate),
             'avgWin': float(avg_win),
             'avgLoss': float(avg_loss),
             'profitFactor': float(profit_factor),
-            'trades': self.trades,
+            'maxDrawdown': float(max_drawdown),
+            'sharpeRatio': float(sharpe_ratio),
+            'equityCurve': equity.tolist(),
+            'trades': self._trades_payload(),
         }
 
 
+class QuoteStream:
+    """Polls index quotes in one background thread and shares each snapshot
+    with every connected stream client"""
+    
+    def __init__(self, symbols: List[str], interval: float = STREAM_INTERVAL):
+        self.symbols = symbols
+        self.interval = interval
+        self._snapshot = []
+        self._version = 0
+        self._condition = threading.Condition()
+        self._thread = None
+    
+    def start(self):
+        """Start the polling thread on first use"""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='quote-stream', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            try:
+                snapshot = MarketDataProvider.get_real_time_data(self.symbols)
+            except Exception as e:
+                print(f"Error refreshing quote stream: {e}")
+                snapshot = []
+            
+            if snapshot:
+                with self._condition:
+                    self._snapshot = snapshot
+                    self._version += 1
+                    self._condition.notify_all()
+            
+            time.sleep(self.interval)
+    
+    def wait_for_update(self, last_version: int, timeout: float) -> Tuple[int, List[Dict]]:
+        """Block until a snapshot newer than `last_version` exists or `timeout` expires"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > last_version, timeout=timeout)
+            return self._version, self._snapshot
+
+
+quote_stream = QuoteStream(list(ALL_INDICES.keys()))
+
+
 # API Routes
 
 @app.route('/api/market/indices', methods=['GET'])
@@ -426,6 +769,35 @@ def get_indices():
     return jsonify(data)
 
 
+@app.route('/api/market/stream', methods=['GET'])
+def stream_indices():
+    """Stream real-time index data as Server-Sent Events"""
+    quote_stream.start()
+    
+    def generate():
+        version = 0
+        last_payload = None
+        while True:
+            new_version, snapshot = quote_stream.wait_for_update(version, timeout=STREAM_KEEPALIVE)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            
+            version = new_version
+            payload = app.json.dumps(snapshot)
+            
+            # Only push when quotes actually changed
+            if payload != last_payload:
+                last_payload = payload
+                yield f"data: {payload}\n\n"
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 @app.route('/api/market/index/<symbol>', methods=['GET'])
 def get_index_data(symbol):
     """Get specific index data"""
@@ -446,14 +818,12 @@ def get_historical(symbol):
     if data.empty:
         return jsonify({'error': 'No data found'}), 404
     
-    # Convert to JSON-serializable format
-    data_dict = data.reset_index().to_dict('records')
+    # Columnar payload: one list per field instead of one dict per bar
+    payload = {'Date': data.index.astype(str).tolist()}
+    for column in data.columns:
+        payload[column] = data[column].to_numpy().tolist()
     
-    # Convert Timestamp to string
-    for row in data_dict:
-        row['Date'] = str(row['Date'])
-    
-    return jsonify(data_dict)
+    return jsonify(payload)
 
 
 @app.route('/api/market/options/<symbol>', methods=['GET'])
@@ -483,6 +853,43 @@ def run_backtest():
     return jsonify(results)
 
 
+@app.route('/api/backtest/grid', methods=['POST'])
+def run_grid_backtest():
+    """Run an SMA crossover backtest over a grid of period pairs"""
+    strategy = request.json.get('strategy')
+    symbol = strategy.get('symbol', 'NIFTY 50')
+    period = request.json.get('period', '1y')
+    short_periods = request.json.get('shortPeriods') or []
+    long_periods = request.json.get('longPeriods') or []
+    
+    if strategy.get('type', 'sma_crossover') != 'sma_crossover':
+        return jsonify({'error': 'Grid backtest only supports sma_crossover'}), 400
+    
+    if not short_periods or not long_periods:
+        return jsonify({'error': 'shortPeriods and longPeriods are required'}), 400
+    
+    for periods in (short_periods, long_periods):
+        if not isinstance(periods, list) or not all(
+            isinstance(p, int) and not isinstance(p, bool) and p > 0 for p in periods
+        ):
+            return jsonify({'error': 'shortPeriods and longPeriods must be lists of positive integers'}), 400
+    
+    if len(short_periods) * len(long_periods) > MAX_GRID_COMBOS:
+        return jsonify({'error': f'Grid too large: at most {MAX_GRID_COMBOS} period combinations'}), 400
+    
+    # Get historical data
+    historical_data = MarketDataProvider.get_historical_data(symbol, period)
+    
+    if historical_data.empty:
+        return jsonify({'error': 'No historical data available'}), 400
+    
+    # Run backtest
+    engine = BacktestEngine(initial_capital=strategy.get('initialCapital', 1000000))
+    results = engine.run_grid_backtest(strategy, historical_data, short_periods, long_periods)
+    
+    return jsonify(results)
+
+
 @app.route('/api/strategy/validate', methods=['POST'])
 def validate_strategy():
     """Validate strategy configuration"""
@@ -541,4 +948,6 @@ if __name__ == '__main__':
     print("TradeForge Backend Starting...")
     print("Available Indices:", list(ALL_INDICES.keys()))
     print("Server running on http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; debug mode is enabled via FLASK_DEBUG=1.
+    # In production run under gunicorn instead (see wsgi.py).
+    app.run(host='0.0.0.0', port=5000, threaded=True)
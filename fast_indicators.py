@@ -0,0 +1,84 @@
+"""
+Numba-compiled technical indicator kernels for TradeForge.
+Each kernel takes and returns float64 arrays and reproduces the warm-up
+(leading NaN) behaviour of the equivalent `ta` indicator with fillna=False.
+"""
+
+import numpy as np
+
+from _njit import njit
+
+
+@njit(cache=True)
+def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """Exponentially weighted mean matching pandas ewm(alpha=..., adjust=False)"""
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+
+    weighted = values[0]
+    nobs = 0 if np.isnan(weighted) else 1
+    if nobs >= min_periods:
+        out[0] = weighted
+    old_wt = 1.0
+
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = not np.isnan(cur)
+        if is_observation:
+            nobs += 1
+
+        if not np.isnan(weighted):
+            old_wt *= 1.0 - alpha
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+
+        if nobs >= min_periods:
+            out[i] = weighted
+
+    return out
+
+
+@njit(cache=True)
+def ema(close: np.ndarray, period: int) -> np.ndarray:
+    """Exponential Moving Average"""
+    return _ewm(close, 2.0 / (period + 1), period)
+
+
+@njit(cache=True)
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing"""
+    n = len(close)
+    up = np.zeros(n)
+    down = np.zeros(n)
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if diff > 0:
+            up[i] = diff
+        elif diff < 0:
+            down[i] = -diff
+
+    avg_up = _ewm(up, 1.0 / period, period)
+    avg_down = _ewm(down, 1.0 / period, period)
+
+    out = np.full(n, np.nan)
+    for i in range(n):
+        if avg_down[i] == 0:
+            out[i] = 100.0
+        elif not np.isnan(avg_down[i]):
+            out[i] = 100.0 - 100.0 / (1.0 + avg_up[i] / avg_down[i])
+
+    return out
+
+
+@njit(cache=True)
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD line, signal line and histogram"""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = _ewm(macd_line, 2.0 / (signal + 1), signal)
+    return macd_line, signal_line, macd_line - signal_line
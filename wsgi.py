@@ -0,0 +1,10 @@
+"""
+TradeForge - WSGI entrypoint for production servers
+
+Run with:
+    gunicorn -k gthread -w 2 --threads 16 -b 0.0.0.0:5000 wsgi:app
+"""
+
+from backend import app
+
+__all__ = ['app']